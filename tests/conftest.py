@@ -5,6 +5,8 @@ import importlib.machinery
 import sys
 from pathlib import Path
 
+import pytest
+
 # Register .pyw as a valid Python source extension
 importlib.machinery.SOURCE_SUFFIXES.append(".pyw")
 
@@ -17,3 +19,74 @@ _spec = importlib.util.spec_from_file_location(
 _mod = importlib.util.module_from_spec(_spec)
 sys.modules["youtube_mp3_downloader"] = _mod
 _spec.loader.exec_module(_mod)
+
+
+def _reset_caches():
+    _mod._get_ffmpeg_location.cache_clear()
+    _mod._settings_path.cache_clear()
+    _mod._default_output_dir.cache_clear()
+    _mod._reset_settings_cache()
+    _mod._clear_playlist_cache()
+
+
+@pytest.fixture(autouse=True)
+def _clear_module_caches():
+    """Reset memoized helpers and cached settings between tests.
+
+    Tests patch ``sys`` attributes and ``_settings_path`` freely, so nothing
+    computed by one test may leak into the next.
+    """
+    _reset_caches()
+    yield
+    _reset_caches()
+
+
+_IO_FIXTURES = frozenset({"tmp_path", "tmp_path_factory"})
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """Group tests for ``pytest -n auto --dist=loadgroup``.
+
+    Tests touching temporary folders share the "io" group and run on one
+    worker; pure in-memory tests stay ungrouped so they spread freely
+    across all workers. Runs before pytest-xdist's own hook, which reads
+    the marker. Without pytest-xdist the marker is inert.
+    """
+    for item in items:
+        if item.get_closest_marker("xdist_group"):
+            continue
+        if _IO_FIXTURES.intersection(item.fixturenames):
+            item.add_marker(pytest.mark.xdist_group("io"))
+
+
+_MISSING = object()
+_FROZEN_ATTRS = ("frozen", "_MEIPASS", "executable")
+
+
+@pytest.fixture
+def frozen_env():
+    """Pretend to run from a PyInstaller bundle.
+
+    Call ``frozen_env(meipass=..., executable=...)`` inside a test; the
+    ``sys`` attributes are set directly and restored (or removed again)
+    at teardown.
+    """
+    saved = {name: getattr(sys, name, _MISSING) for name in _FROZEN_ATTRS}
+
+    def apply(meipass=None, executable=None):
+        sys.frozen = True
+        if meipass is not None:
+            sys._MEIPASS = str(meipass)
+        if executable is not None:
+            sys.executable = str(executable)
+        _reset_caches()
+
+    yield apply
+    for name, value in saved.items():
+        if value is _MISSING:
+            if hasattr(sys, name):
+                delattr(sys, name)
+        else:
+            setattr(sys, name, value)
+    _reset_caches()
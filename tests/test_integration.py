@@ -15,6 +15,7 @@ from youtube_mp3_downloader import (
     DownloadEngine,
     VideoStatus,
     VideoTask,
+    _scan_by_ext,
 )
 
 # A short, freely available video for testing
@@ -99,18 +100,15 @@ class TestDownloadSingle:
         assert len(result_tasks) == 1
         assert result_tasks[0].status == VideoStatus.COMPLETED
 
+        files = _scan_by_ext(outdir, {"mp3", "webp", "jpg", "png"})
+
         # Verify MP3 file exists
-        mp3s = list(outdir.glob("*.mp3"))
-        assert len(mp3s) == 1
-        assert mp3s[0].stat().st_size > 0
+        assert len(files["mp3"]) == 1
+        assert (outdir / files["mp3"][0]).stat().st_size > 0
 
         # Verify NO leftover thumbnail files
-        webps = list(outdir.glob("*.webp"))
-        jpgs = list(outdir.glob("*.jpg"))
-        pngs = list(outdir.glob("*.png"))
-        assert webps == [], f"Leftover webp files: {webps}"
-        assert jpgs == [], f"Leftover jpg files: {jpgs}"
-        assert pngs == [], f"Leftover png files: {pngs}"
+        for ext in ("webp", "jpg", "png"):
+            assert files[ext] == [], f"Leftover {ext} files: {files[ext]}"
 
     def test_skip_already_downloaded(self, outdir):
         """Downloading the same video twice should not fail."""
@@ -145,12 +143,13 @@ class TestDownloadSingle:
         engine2.start(entries)
         assert complete_event.wait(timeout=120)
 
-        # Should still complete (not fail)
-        assert result_tasks[0].status == VideoStatus.COMPLETED
+        # Should be skipped without hitting the network again (not fail)
+        assert result_tasks[0].status == VideoStatus.SKIPPED
 
         # File should not have been rewritten
         mp3s = list(outdir.glob("*.mp3"))
         assert len(mp3s) == 1
+        assert mp3s[0].stat().st_mtime == first_mtime
 
 
 class TestDownloadParallel:
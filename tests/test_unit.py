@@ -1,67 +1,134 @@
 """Unit tests – no network required."""
 
+import concurrent.futures
 import json
-import sys
+import os
 import threading
 import time
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+import youtube_mp3_downloader as ytm
 from youtube_mp3_downloader import (
     DownloadEngine,
     VideoStatus,
     VideoTask,
     _default_output_dir,
+    _extract_video_id,
     _get_ffmpeg_location,
     _load_settings,
+    _reset_settings_cache,
     _save_settings,
+    _scan_by_ext,
     _settings_path,
     _truncate,
     _settings_lock,
 )
 
 
-# ---------------------------------------------------------------------------
-# _truncate
-# ---------------------------------------------------------------------------
+def _fake_ydl(on_download=None, info=None, calls=None):
+    """Return a stand-in for yt_dlp.YoutubeDL that never touches the network.
+
+    download() calls ``on_download(opts, urls)``; extract_info() returns
+    ``info`` and, if ``calls`` is given, records the options and the
+    ``process`` flag it was called with.
+    """
+
+    class FakeYDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def download(self, urls):
+            on_download(self.opts, urls)
+
+        def extract_info(self, url, download=True, process=True):
+            if calls is not None:
+                calls.append({"opts": self.opts, "process": process})
+            return info
+
+    return FakeYDL
+
+
+# Engine callback for tests that never inspect what the engine reports.
+NOOP = lambda *a, **k: None
 
-class TestTruncate:
-    def test_short_string_unchanged(self):
-        assert _truncate("hello", 10) == "hello"
 
-    def test_exact_length_unchanged(self):
-        assert _truncate("hello", 5) == "hello"
+class InlineExecutor:
+    """Executor stand-in that runs each job synchronously inside submit()."""
 
-    def test_long_string_truncated(self):
-        result = _truncate("hello world", 8)
-        assert result == "hello w\u2026"
-        assert len(result) == 8
+    def submit(self, fn, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
 
-    def test_single_char_limit(self):
-        result = _truncate("hello", 1)
-        assert result == "\u2026"
 
-    def test_empty_string(self):
-        assert _truncate("", 5) == ""
+@pytest.fixture
+def inline_executor(monkeypatch):
+    """Make DownloadEngine.start() finish all work before it returns."""
+    monkeypatch.setattr(
+        "youtube_mp3_downloader._get_executor", lambda: InlineExecutor()
+    )
+
+
+# ---------------------------------------------------------------------------
+# _truncate
+# ---------------------------------------------------------------------------
+
+class TestTruncate:
+    @pytest.mark.parametrize("text,limit,expected", [
+        pytest.param("hello", 10, "hello", id="short-unchanged"),
+        pytest.param("hello", 5, "hello", id="exact-length-unchanged"),
+        pytest.param("hello world", 8, "hello w\u2026", id="long-truncated"),
+        pytest.param("hello", 1, "\u2026", id="single-char-limit"),
+        pytest.param("", 5, "", id="empty"),
+        pytest.param("hello", 0, "", id="zero-limit"),
+    ])
+    def test_truncate(self, text, limit, expected):
+        result = _truncate(text, limit)
+        assert result == expected
+        assert len(result) <= max(limit, 0)
+
+    def test_no_allocation_for_short_string(self):
+        text = "".join(["hel", "lo"])
+        assert _truncate(text, 10) is text
 
 
 # ---------------------------------------------------------------------------
 # _default_output_dir
 # ---------------------------------------------------------------------------
 
+@pytest.fixture(scope="session")
+def home():
+    """The user's home directory, resolved once for the whole run."""
+    return Path.home()
+
+
 class TestDefaultOutputDir:
-    def test_returns_music_subdirectory(self):
+    def test_returns_music_subdirectory(self, home):
         result = _default_output_dir()
         path = Path(result)
         assert path.name == "YouTube Downloads"
         assert path.parent.name == "Music"
-        assert str(Path.home()) in result
+        assert str(home) in result
 
     def test_returns_string(self):
         assert isinstance(_default_output_dir(), str)
 
+    def test_result_memoized(self):
+        assert _default_output_dir() is _default_output_dir()
+
 
 # ---------------------------------------------------------------------------
 # _get_ffmpeg_location
@@ -71,32 +138,65 @@ class TestGetFfmpegLocation:
     def test_returns_none_when_not_frozen(self):
         assert _get_ffmpeg_location() is None
 
-    def test_returns_path_when_frozen_with_ffmpeg(self, tmp_path):
+    def test_returns_path_when_frozen_with_ffmpeg(self, tmp_path, frozen_env):
         (tmp_path / "ffmpeg").touch()
-        with patch.object(sys, "frozen", True, create=True), \
-             patch.object(sys, "_MEIPASS", str(tmp_path), create=True):
-            result = _get_ffmpeg_location()
-            assert result == str(tmp_path)
+        frozen_env(meipass=tmp_path)
+        assert _get_ffmpeg_location() == str(tmp_path)
 
-    def test_returns_none_when_frozen_without_ffmpeg(self, tmp_path):
-        with patch.object(sys, "frozen", True, create=True), \
-             patch.object(sys, "_MEIPASS", str(tmp_path), create=True):
-            assert _get_ffmpeg_location() is None
+    def test_returns_none_when_frozen_without_ffmpeg(self, tmp_path, frozen_env):
+        frozen_env(meipass=tmp_path)
+        assert _get_ffmpeg_location() is None
 
 
 # ---------------------------------------------------------------------------
 # Settings persistence
 # ---------------------------------------------------------------------------
 
+_SETTINGS_PAYLOADS = [
+    {"output_dir": "/some/path"},
+    {},
+    {"output_dir": ""},
+    {"output_dir": "C:\\Users\\me\\Music"},
+    {"output_dir": "/M\u00fasica/\u97f3\u697d \U0001F3B5"},
+    {"output_dir": "/a", "workers": 8},
+    {"flag": True, "none": None},
+    {"nested": {"a": [1, 2, 3]}},
+    {"quote": 'say "hi"\nnext line'},
+    {f"key_{i}": i for i in range(50)},
+]
+
+
+@pytest.fixture
+def memory_settings(monkeypatch):
+    """Back the settings file with a dict so tests skip the disk round-trip.
+
+    Values go through JSON just like the real file, so serialization bugs
+    still surface.
+    """
+    store = {}
+
+    def read(path):
+        try:
+            return json.loads(store[path])
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def write(path, settings):
+        store[path] = json.dumps(settings)
+
+    monkeypatch.setattr("youtube_mp3_downloader._read_settings_file", read)
+    monkeypatch.setattr("youtube_mp3_downloader._write_settings_file", write)
+    return store
+
+
 class TestSettings:
-    def test_save_and_load(self, tmp_path, monkeypatch):
-        settings_file = tmp_path / "settings.json"
-        monkeypatch.setattr(
-            "youtube_mp3_downloader._settings_path", lambda: settings_file
-        )
-        _save_settings({"output_dir": "/some/path"})
-        loaded = _load_settings()
-        assert loaded["output_dir"] == "/some/path"
+    @pytest.mark.parametrize("payload", _SETTINGS_PAYLOADS)
+    def test_save_and_load(self, memory_settings, payload):
+        _save_settings(payload)
+        assert _load_settings() == payload
+        # and again from the backing store, bypassing the in-memory copy
+        _reset_settings_cache()
+        assert _load_settings() == payload
 
     def test_load_missing_file(self, tmp_path, monkeypatch):
         settings_file = tmp_path / "nonexistent.json"
@@ -113,177 +213,389 @@ class TestSettings:
         )
         assert _load_settings() == {}
 
-    def test_settings_path_not_frozen(self):
+    def test_save_is_atomic_and_persisted(self, tmp_path, monkeypatch):
+        settings_file = tmp_path / "settings.json"
+        monkeypatch.setattr(
+            "youtube_mp3_downloader._settings_path", lambda: settings_file
+        )
+        _save_settings({"output_dir": "/some/path"})
+        assert [p.name for p in tmp_path.iterdir()] == ["settings.json"]
+        _reset_settings_cache()
+        assert _load_settings() == {"output_dir": "/some/path"}
+
+    def test_failed_save_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        settings_file = tmp_path / "settings.json"
+        monkeypatch.setattr(
+            "youtube_mp3_downloader._settings_path", lambda: settings_file
+        )
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(ytm.os, "replace", fail_replace)
+        _save_settings({"output_dir": "/some/path"})
+        assert list(tmp_path.iterdir()) == []
+
+    def test_load_returns_copy(self, memory_settings):
+        _save_settings({"output_dir": "/some/path"})
+        _load_settings()["output_dir"] = "/changed"
+        assert _load_settings()["output_dir"] == "/some/path"
+
+    def test_settings_path_not_frozen(self, home):
         path = _settings_path()
-        assert path == Path.home() / ".yt_mp3_settings.json"
+        assert path == home / ".yt_mp3_settings.json"
 
-    def test_settings_path_frozen(self, tmp_path):
+    def test_settings_path_frozen(self, tmp_path, frozen_env):
         exe = tmp_path / "app.exe"
         exe.touch()
-        with patch.object(sys, "frozen", True, create=True), \
-             patch.object(sys, "executable", str(exe)):
-            path = _settings_path()
-            assert path == tmp_path / ".yt_mp3_settings.json"
+        frozen_env(executable=exe)
+        assert _settings_path() == tmp_path / ".yt_mp3_settings.json"
 
 
 # ---------------------------------------------------------------------------
 # VideoStatus
 # ---------------------------------------------------------------------------
 
+_EXPECTED_STATUSES = frozenset({
+    "PENDING", "DOWNLOADING", "CONVERTING", "COMPLETED",
+    "SKIPPED", "FAILED", "CANCELLED",
+})
+
+
 class TestVideoStatus:
     def test_all_values_present(self):
-        expected = {
-            "PENDING", "DOWNLOADING", "CONVERTING", "COMPLETED",
-            "SKIPPED", "FAILED", "CANCELLED",
-        }
-        assert {s.value for s in VideoStatus} == expected
+        assert frozenset(s.value for s in VideoStatus) == _EXPECTED_STATUSES
 
 
 # ---------------------------------------------------------------------------
 # VideoTask
 # ---------------------------------------------------------------------------
 
+_VIDEO_TASK_DEFAULTS = {
+    "status": VideoStatus.PENDING, "progress_pct": 0.0, "error_msg": "",
+    "attempts": 0, "downloaded_bytes": 0, "total_bytes": 0,
+}
+
+
 class TestVideoTask:
-    def test_defaults(self):
-        task = VideoTask(url="http://x", title="T", video_id="1", index=1, total=5)
-        assert task.status == VideoStatus.PENDING
-        assert task.progress_pct == 0.0
-        assert task.error_msg == ""
-        assert task.attempts == 0
-
-    def test_custom_values(self):
-        task = VideoTask(
-            url="http://x", title="T", video_id="1",
-            index=3, total=10,
-            status=VideoStatus.DOWNLOADING,
-            progress_pct=42.5,
-            error_msg="some error",
-            attempts=2,
-        )
-        assert task.index == 3
-        assert task.progress_pct == 42.5
-        assert task.error_msg == "some error"
+    @pytest.mark.parametrize("overrides", [
+        {},
+        {
+            "index": 3, "total": 10, "status": VideoStatus.DOWNLOADING,
+            "progress_pct": 42.5, "error_msg": "some error", "attempts": 2,
+        },
+    ], ids=["defaults", "custom"])
+    def test_construction(self, overrides):
+        kwargs = {"url": "http://x", "title": "T", "video_id": "1",
+                  "index": 1, "total": 5, **overrides}
+        task = VideoTask(**kwargs)
+        expected = {**_VIDEO_TASK_DEFAULTS, **kwargs}
+        for field, value in expected.items():
+            assert getattr(task, field) == value, field
 
 
 # ---------------------------------------------------------------------------
-# DownloadEngine._build_ydl_opts
+# DownloadEngine.__init__
 # ---------------------------------------------------------------------------
 
-class TestBuildYdlOpts:
-    def setup_method(self):
-        self.engine = DownloadEngine(
+class TestEngineInit:
+    def test_default_max_workers_scales_with_cores(self):
+        engine = DownloadEngine(
+            outdir=Path("/tmp/test"),
+            on_update=NOOP,
+            on_complete=NOOP,
+        )
+        assert engine.max_workers == min(32, (os.cpu_count() or 1) + 4)
+        assert engine.max_workers >= 5
+
+    def test_explicit_max_workers_kept(self):
+        engine = DownloadEngine(
             outdir=Path("/tmp/test"),
-            max_workers=4,
-            on_update=MagicMock(),
-            on_complete=MagicMock(),
+            max_workers=2,
+            on_update=NOOP,
+            on_complete=NOOP,
         )
+        assert engine.max_workers == 2
+
+
+# ---------------------------------------------------------------------------
+# DownloadEngine._build_ydl_opts
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def ydl_engine():
+    return DownloadEngine(
+        outdir=Path("/tmp/test"),
+        max_workers=4,
+        on_update=NOOP,
+        on_complete=NOOP,
+    )
 
-    def test_output_template(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        assert "%(title)s.%(ext)s" in opts["outtmpl"]
-        assert "/tmp/test" in opts["outtmpl"]
 
-    def test_audio_format_mp3_320(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        extractors = [p for p in opts["postprocessors"] if p["key"] == "FFmpegExtractAudio"]
+@pytest.fixture(scope="module")
+def ydl_opts(ydl_engine):
+    """Options built once and shared read-only by the assertions below."""
+    return ydl_engine._build_ydl_opts(lambda d: None, lambda d: None)
+
+
+@pytest.fixture(scope="module")
+def postprocessor_positions(ydl_opts):
+    """Map each postprocessor key to its index in the chain."""
+    return {p["key"]: i for i, p in enumerate(ydl_opts["postprocessors"])}
+
+
+class TestBuildYdlOpts:
+    def test_output_template(self, ydl_opts):
+        assert "%(title)s.%(ext)s" in ydl_opts["outtmpl"]
+        assert "/tmp/test" in ydl_opts["outtmpl"]
+
+    def test_audio_format_mp3_320(self, ydl_opts):
+        extractors = [p for p in ydl_opts["postprocessors"] if p["key"] == "FFmpegExtractAudio"]
         assert len(extractors) == 1
         assert extractors[0]["preferredcodec"] == "mp3"
         assert extractors[0]["preferredquality"] == "320"
 
-    def test_thumbnail_converter_before_embed(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        keys = [p["key"] for p in opts["postprocessors"]]
-        converter_idx = keys.index("FFmpegThumbnailsConvertor")
-        embed_idx = keys.index("EmbedThumbnail")
+    def test_thumbnail_converter_before_embed(self, postprocessor_positions):
+        converter_idx = postprocessor_positions["FFmpegThumbnailsConvertor"]
+        embed_idx = postprocessor_positions["EmbedThumbnail"]
         assert converter_idx < embed_idx, "Thumbnail converter must run before embed"
 
-    def test_thumbnail_converter_format_jpg(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        converters = [p for p in opts["postprocessors"] if p["key"] == "FFmpegThumbnailsConvertor"]
+    def test_thumbnail_converter_format_jpg(self, ydl_opts):
+        converters = [p for p in ydl_opts["postprocessors"] if p["key"] == "FFmpegThumbnailsConvertor"]
         assert converters[0]["format"] == "jpg"
 
-    def test_writethumbnail_enabled(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        assert opts["writethumbnail"] is True
+    def test_postprocessor_args_set(self, ydl_opts):
+        args = ydl_opts["postprocessor_args"]["thumbnailsconvertor+ffmpeg_o"]
+        assert args == ["-c:v", "mjpeg", "-q:v", "3"]
 
-    def test_reliability_options(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        assert opts["retries"] == 5
-        assert opts["fragment_retries"] == 5
-        assert opts["extractor_retries"] == 3
-        assert opts["socket_timeout"] == 30
+    def test_writethumbnail_enabled(self, ydl_opts):
+        assert ydl_opts["writethumbnail"] is True
 
-    def test_noplaylist_always_true(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        assert opts["noplaylist"] is True
+    def test_reliability_options(self, ydl_opts):
+        assert ydl_opts["retries"] == 5
+        assert ydl_opts["fragment_retries"] == 5
+        assert ydl_opts["extractor_retries"] == 3
+        assert ydl_opts["socket_timeout"] == 30
 
-    def test_progress_hooks_set(self):
+    def test_noplaylist_always_true(self, ydl_opts):
+        assert ydl_opts["noplaylist"] is True
+
+    def test_progress_hooks_set(self, ydl_engine):
         hook = MagicMock()
-        opts = self.engine._build_ydl_opts(hook, lambda d: None)
+        opts = ydl_engine._build_ydl_opts(hook, lambda d: None)
         assert hook in opts["progress_hooks"]
 
-    def test_ffmpeg_location_not_set_when_not_frozen(self):
-        opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-        assert "ffmpeg_location" not in opts
+    def test_opts_are_independent_per_call(self, ydl_engine):
+        first = ydl_engine._build_ydl_opts(lambda d: None, lambda d: None)
+        first["overwrites"] = True
+        second_hook = MagicMock()
+        second = ydl_engine._build_ydl_opts(second_hook, lambda d: None)
+        assert second["overwrites"] is False
+        assert second["progress_hooks"] == [second_hook]
+
+    def test_ffmpeg_location_not_set_when_not_frozen(self, ydl_opts):
+        assert "ffmpeg_location" not in ydl_opts
 
-    def test_ffmpeg_location_set_when_frozen(self, tmp_path):
+    def test_ffmpeg_location_set_when_frozen(self, ydl_engine, tmp_path, frozen_env):
         (tmp_path / "ffmpeg").touch()
-        with patch.object(sys, "frozen", True, create=True), \
-             patch.object(sys, "_MEIPASS", str(tmp_path), create=True):
-            opts = self.engine._build_ydl_opts(lambda d: None, lambda d: None)
-            assert opts["ffmpeg_location"] == str(tmp_path)
+        frozen_env(meipass=tmp_path)
+        opts = ydl_engine._build_ydl_opts(lambda d: None, lambda d: None)
+        assert opts["ffmpeg_location"] == str(tmp_path)
 
 
 # ---------------------------------------------------------------------------
-# DownloadEngine.find_existing
+# _extract_video_id / DownloadEngine.extract_playlist_info
 # ---------------------------------------------------------------------------
 
-class TestFindExisting:
-    def test_finds_matching_mp3(self, tmp_path):
-        (tmp_path / "Song Title.mp3").touch()
-        entries = [{"title": "Song Title", "id": "abc123"}]
-        found = DownloadEngine.find_existing(entries, tmp_path)
-        assert found == {"abc123"}
+class TestExtractVideoId:
+    @pytest.mark.parametrize("url,expected", [
+        ("https://www.youtube.com/watch?v=xgB3I2i9m0U", "xgB3I2i9m0U"),
+        ("https://www.youtube.com/watch?feature=x&v=xgB3I2i9m0U", "xgB3I2i9m0U"),
+        ("https://www.youtube.com/watch?v=xgB3I2i9m0U&t=42", "xgB3I2i9m0U"),
+        ("https://www.youtube.com/watch?v=tooshort", None),
+        ("https://www.youtube.com/watch?v=xgB3I2i9m0Uxx", None),
+        ("https://www.youtube.com/playlist?list=PL123", None),
+    ])
+    def test_extract(self, url, expected):
+        assert _extract_video_id(url) == expected
+
+
+class TestExtractPlaylistInfoFastPath:
+    def test_single_video_skips_processing(self):
+        calls = []
+        info = {
+            "id": "xgB3I2i9m0U",
+            "title": "Song",
+            "webpage_url": "https://www.youtube.com/watch?v=xgB3I2i9m0U",
+        }
+        fake = _fake_ydl(info=info, calls=calls)
+        with patch.object(ytm.yt_dlp, "YoutubeDL", fake):
+            entries = DownloadEngine.extract_playlist_info(info["webpage_url"])
+        assert entries == [
+            {"url": info["webpage_url"], "title": "Song", "id": "xgB3I2i9m0U"}
+        ]
+        assert len(calls) == 1
+        assert calls[0]["process"] is False
+        assert calls[0]["opts"]["noplaylist"] is True
+
+    def test_playlist_url_uses_full_extraction(self):
+        calls = []
+        info = {"entries": [{"id": "a" * 11, "title": "A", "url": "http://a"}]}
+        fake = _fake_ydl(info=info, calls=calls)
+        url = "https://www.youtube.com/watch?v=xgB3I2i9m0U&list=PL123"
+        with patch.object(ytm.yt_dlp, "YoutubeDL", fake):
+            entries = DownloadEngine.extract_playlist_info(url)
+        assert [e["id"] for e in entries] == ["a" * 11]
+        assert [c["process"] for c in calls] == [True]
+
+    def test_single_video_unavailable_returns_empty(self):
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(info=None)):
+            entries = DownloadEngine.extract_playlist_info(
+                "https://www.youtube.com/watch?v=ZZZZZZZZZZZ"
+            )
+        assert entries == []
+
+
+class TestPlaylistInfoCache:
+    ENTRIES = [{"url": "http://a", "title": "A", "id": "1"}]
+
+    def test_repeat_lookup_served_from_cache(self):
+        fetch = MagicMock(return_value=list(self.ENTRIES))
+        with patch.object(DownloadEngine, "_fetch_playlist_info", fetch):
+            first = DownloadEngine.extract_playlist_info("http://list")
+            second = DownloadEngine.extract_playlist_info("http://list")
+        assert first == second == self.ENTRIES
+        fetch.assert_called_once_with("http://list")
+
+    def test_cached_entries_not_shared_with_callers(self):
+        fetch = MagicMock(return_value=list(self.ENTRIES))
+        with patch.object(DownloadEngine, "_fetch_playlist_info", fetch):
+            first = DownloadEngine.extract_playlist_info("http://list")
+            first[0]["title"] = "changed"
+            first.clear()
+            second = DownloadEngine.extract_playlist_info("http://list")
+        assert second == self.ENTRIES
+
+    def test_expired_entry_refetched(self, monkeypatch):
+        monkeypatch.setattr("youtube_mp3_downloader._PLAYLIST_CACHE_TTL", 0)
+        fetch = MagicMock(return_value=list(self.ENTRIES))
+        with patch.object(DownloadEngine, "_fetch_playlist_info", fetch):
+            DownloadEngine.extract_playlist_info("http://list")
+            DownloadEngine.extract_playlist_info("http://list")
+        assert fetch.call_count == 2
+
+    def test_empty_result_not_cached(self):
+        fetch = MagicMock(return_value=[])
+        with patch.object(DownloadEngine, "_fetch_playlist_info", fetch):
+            DownloadEngine.extract_playlist_info("http://bad")
+            DownloadEngine.extract_playlist_info("http://bad")
+        assert fetch.call_count == 2
 
-    def test_case_insensitive(self, tmp_path):
-        (tmp_path / "SONG TITLE.mp3").touch()
-        entries = [{"title": "song title", "id": "abc"}]
-        found = DownloadEngine.find_existing(entries, tmp_path)
-        assert found == {"abc"}
 
-    def test_no_match(self, tmp_path):
-        (tmp_path / "Other Song.mp3").touch()
-        entries = [{"title": "Song Title", "id": "abc"}]
-        found = DownloadEngine.find_existing(entries, tmp_path)
-        assert found == set()
+# ---------------------------------------------------------------------------
+# DownloadEngine.find_existing
+# ---------------------------------------------------------------------------
+
+_FIND_EXISTING_LAYOUTS = {
+    "match": ["Song Title.mp3"],
+    "case_insensitive": ["SONG TITLE.mp3"],
+    "upper_ext": ["Song Title.MP3"],
+    "no_match": ["Other Song.mp3"],
+    "empty": [],
+    "non_mp3": ["Song Title.webp", "Song Title.jpg"],
+}
+# Folders for the scaling cases: every even-numbered song is already there.
+_MULTI_SIZES = (1, 10, 100)
+_FIND_EXISTING_LAYOUTS.update({
+    f"multi_{n}": [f"Song {i}.mp3" for i in range(0, n, 2)]
+    for n in _MULTI_SIZES
+})
+
+
+def _mkfiles(base, names):
+    """Create empty files ``names`` in ``base`` with one open/close each."""
+    base = os.fspath(base)
+    for name in names:
+        os.close(os.open(os.path.join(base, name), os.O_CREAT | os.O_WRONLY, 0o644))
+
+
+@pytest.fixture(scope="session")
+def existing_layouts(tmp_path_factory):
+    """One prebuilt output folder per find_existing scenario.
+
+    find_existing only reads the folder, so tests use these directly.
+    """
+    layouts = {}
+    for name, files in _FIND_EXISTING_LAYOUTS.items():
+        base = tmp_path_factory.mktemp(name)
+        _mkfiles(base, files)
+        layouts[name] = base
+    return layouts
 
-    def test_empty_dir(self, tmp_path):
-        entries = [{"title": "Song", "id": "abc"}]
-        found = DownloadEngine.find_existing(entries, tmp_path)
-        assert found == set()
+
+class TestFindExisting:
+    @pytest.mark.parametrize("layout,title,expected", [
+        ("match", "Song Title", {"abc"}),
+        ("case_insensitive", "song title", {"abc"}),
+        ("upper_ext", "Song Title", {"abc"}),
+        ("no_match", "Song Title", set()),
+        ("empty", "Song Title", set()),
+        ("non_mp3", "Song Title", set()),
+    ])
+    def test_single_entry(self, existing_layouts, layout, title, expected):
+        entries = [{"title": title, "id": "abc"}]
+        found = DownloadEngine.find_existing(entries, existing_layouts[layout])
+        assert found == expected
 
     def test_nonexistent_dir(self, tmp_path):
         entries = [{"title": "Song", "id": "abc"}]
         found = DownloadEngine.find_existing(entries, tmp_path / "nope")
         assert found == set()
 
-    def test_ignores_non_mp3_files(self, tmp_path):
-        (tmp_path / "Song Title.webp").touch()
-        (tmp_path / "Song Title.jpg").touch()
+    def test_accepts_str_path(self, existing_layouts):
+        entries = [{"title": "Song Title", "id": "abc"}]
+        found = DownloadEngine.find_existing(
+            entries, str(existing_layouts["match"])
+        )
+        assert found == {"abc"}
+
+    def test_ignores_directories(self, tmp_path):
+        (tmp_path / "Song Title.mp3").mkdir()
         entries = [{"title": "Song Title", "id": "abc"}]
         found = DownloadEngine.find_existing(entries, tmp_path)
         assert found == set()
 
-    def test_multiple_entries(self, tmp_path):
-        (tmp_path / "Song A.mp3").touch()
-        (tmp_path / "Song C.mp3").touch()
-        entries = [
-            {"title": "Song A", "id": "1"},
-            {"title": "Song B", "id": "2"},
-            {"title": "Song C", "id": "3"},
-        ]
-        found = DownloadEngine.find_existing(entries, tmp_path)
-        assert found == {"1", "3"}
+    @pytest.mark.parametrize("n", _MULTI_SIZES)
+    def test_multiple_entries(self, existing_layouts, n):
+        entries = [{"title": f"Song {i}", "id": str(i)} for i in range(n)]
+        found = DownloadEngine.find_existing(entries, existing_layouts[f"multi_{n}"])
+        assert found == {str(i) for i in range(0, n, 2)}
+
+    def test_scans_folder_once(self, existing_layouts, monkeypatch):
+        calls = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(
+            os, "scandir", lambda path: calls.append(path) or real_scandir(path)
+        )
+        entries = [{"title": f"Song {i}", "id": str(i)} for i in range(100)]
+        found = DownloadEngine.find_existing(entries, existing_layouts["multi_100"])
+        assert len(found) == 50
+        assert len(calls) == 1
+
+
+class TestScanByExt:
+    def test_groups_names_by_extension(self, tmp_path):
+        _mkfiles(tmp_path, (
+            "a.mp3", "b.mp3", "Song Title.MP3", "a.webp", "notes.txt", "mp3",
+        ))
+        (tmp_path / "dir.jpg").mkdir()
+        found = _scan_by_ext(tmp_path, {"mp3", "webp", "jpg"})
+        assert sorted(found["mp3"]) == ["Song Title.MP3", "a.mp3", "b.mp3"]
+        assert found["webp"] == ["a.webp"]
+        assert found["jpg"] == []
+
+    def test_missing_directory(self, tmp_path):
+        assert _scan_by_ext(tmp_path / "nope", {"mp3"}) == {"mp3": []}
 
 
 # ---------------------------------------------------------------------------
@@ -291,58 +603,257 @@ class TestFindExisting:
 # ---------------------------------------------------------------------------
 
 class TestStartWithSkipIds:
-    def test_skipped_tasks_marked(self):
-        complete_event = threading.Event()
+    def test_skipped_tasks_marked(self, inline_executor):
         result = []
-
-        def on_complete(tasks):
-            result.extend(tasks)
-            complete_event.set()
-
         engine = DownloadEngine(
             outdir=Path("/tmp"),
             max_workers=1,
-            on_update=MagicMock(),
-            on_complete=on_complete,
+            on_update=NOOP,
+            on_complete=result.extend,
         )
         entries = [
             {"url": "http://a", "title": "A", "id": "1"},
             {"url": "http://b", "title": "B", "id": "2"},
         ]
         engine.start(entries, skip_ids={"1", "2"})
-        assert complete_event.wait(timeout=5)
+        assert len(result) == 2
         assert all(t.status == VideoStatus.SKIPPED for t in result)
 
+    def test_only_unskipped_tasks_downloaded(self, tmp_path, inline_executor):
+        downloaded = []
+        result = []
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=1,
+            on_update=NOOP,
+            on_complete=result.extend,
+        )
+        entries = [
+            {"url": "http://a", "title": "A", "id": "1"},
+            {"url": "http://b", "title": "B", "id": "2"},
+        ]
+        fake = _fake_ydl(lambda opts, urls: downloaded.extend(urls))
+        with patch.object(ytm.yt_dlp, "YoutubeDL", fake):
+            engine.start(entries, skip_ids={"1"})
+        assert downloaded == ["http://b"]
+        assert [t.status for t in result] == [
+            VideoStatus.SKIPPED, VideoStatus.COMPLETED,
+        ]
+
+    def test_existing_files_skipped_by_default(self, tmp_path, inline_executor):
+        (tmp_path / "A.mp3").touch()
+        result = []
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=1,
+            on_update=NOOP,
+            on_complete=result.extend,
+        )
+        with patch.object(ytm.yt_dlp, "YoutubeDL") as ydl:
+            engine.start([{"url": "http://a", "title": "A", "id": "1"}])
+        ydl.assert_not_called()
+        assert [t.status for t in result] == [VideoStatus.SKIPPED]
+
 
 # ---------------------------------------------------------------------------
-# DownloadEngine.cancel
+# DownloadEngine worker lifecycle
 # ---------------------------------------------------------------------------
 
-class TestEngineCancel:
-    def test_cancel_sets_event(self):
+class TestCompletion:
+    def test_complete_reported_once_after_last_task(self, tmp_path, inline_executor):
+        complete_calls = []
+
+        def boom(task):
+            if task.video_id == "2":
+                raise RuntimeError("worker crashed")
+            task.status = VideoStatus.COMPLETED
+
         engine = DownloadEngine(
-            outdir=Path("/tmp"),
-            max_workers=1,
-            on_update=MagicMock(),
-            on_complete=MagicMock(),
+            outdir=tmp_path,
+            max_workers=2,
+            on_update=NOOP,
+            on_complete=lambda tasks: complete_calls.append(list(tasks)),
+        )
+        engine._download_one = boom
+        entries = [
+            {"url": f"http://{i}", "title": str(i), "id": str(i)}
+            for i in range(1, 4)
+        ]
+        engine.start(entries)
+
+        assert len(complete_calls) == 1
+        statuses = {t.video_id: t.status for t in complete_calls[0]}
+        assert statuses == {
+            "1": VideoStatus.COMPLETED,
+            "2": VideoStatus.FAILED,
+            "3": VideoStatus.COMPLETED,
+        }
+
+    def test_parallelism_bounded_by_max_workers(self, tmp_path):
+        active = []
+        peak = []
+        threads = set()
+        lock = threading.Lock()
+        complete_event = threading.Event()
+
+        def download(opts, urls):
+            with lock:
+                active.append(urls[0])
+                peak.append(len(active))
+                threads.add(threading.current_thread().name)
+            time.sleep(0.02)
+            with lock:
+                active.remove(urls[0])
+
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=2,
+            on_update=NOOP,
+            on_complete=lambda tasks: complete_event.set(),
         )
+        entries = [
+            {"url": f"http://{i}", "title": str(i), "id": str(i)}
+            for i in range(6)
+        ]
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(download)):
+            engine.start(entries)
+            assert complete_event.wait(timeout=5)
+
+        assert max(peak) <= 2
+        assert all(t.status == VideoStatus.COMPLETED for t in engine.tasks)
+        assert all(name.startswith("ytdl") for name in threads)
+
+    def test_engines_share_one_executor(self):
+        assert ytm._get_executor() is ytm._get_executor()
+
+
+class TestConversionSlots:
+    def test_conversions_limited_to_slot_count(self, tmp_path):
+        active = []
+        peak = []
+        lock = threading.Lock()
+        complete_event = threading.Event()
+
+        def download(opts, urls):
+            opts["progress_hooks"][0]({"status": "finished"})
+            opts["postprocessor_hooks"][0]({"status": "started"})
+            with lock:
+                active.append(urls[0])
+                peak.append(len(active))
+            time.sleep(0.05)
+            # a second postprocessor in the chain must not take another slot
+            opts["postprocessor_hooks"][0]({"status": "started"})
+            with lock:
+                active.remove(urls[0])
+
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=3,
+            on_update=NOOP,
+            on_complete=lambda tasks: complete_event.set(),
+        )
+        engine._convert_slots = threading.BoundedSemaphore(1)
+        entries = [
+            {"url": f"http://{i}", "title": str(i), "id": str(i)}
+            for i in range(3)
+        ]
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(download)):
+            engine.start(entries)
+            assert complete_event.wait(timeout=5)
+
+        assert max(peak) == 1
+        assert all(t.status == VideoStatus.COMPLETED for t in engine.tasks)
+        # every slot was handed back
+        assert engine._convert_slots.acquire(blocking=False)
+
+
+# ---------------------------------------------------------------------------
+# DownloadEngine.cancel
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def engine():
+    """Idle single-worker engine for attribute-level checks."""
+    return DownloadEngine(
+        outdir=Path("/tmp"),
+        max_workers=1,
+        on_update=NOOP,
+        on_complete=NOOP,
+    )
+
+
+class TestEngineCancel:
+    def test_cancel_sets_event(self, engine):
         assert not engine._cancel.is_set()
+        assert engine._cancel_flag is False
         engine.cancel()
         assert engine._cancel.is_set()
+        assert engine._cancel_flag is True
 
     def test_tasks_property_returns_copy(self):
+        # The property only needs _lock and _tasks; no engine required.
+        stub = SimpleNamespace(
+            _lock=threading.Lock(),
+            _tasks=[VideoTask(url="a", title="A", video_id="1", index=1, total=1)],
+        )
+        tasks = DownloadEngine.tasks.fget(stub)
+        assert tasks == stub._tasks
+        assert tasks is not stub._tasks  # must be a copy
+
+    def test_progress_hook_aborts_after_cancel(self, tmp_path, inline_executor):
+        result = []
+
+        def download(opts, urls):
+            engine.cancel()
+            opts["progress_hooks"][0]({"status": "downloading"})
+            raise AssertionError("hook should have aborted the download")
+
         engine = DownloadEngine(
-            outdir=Path("/tmp"),
+            outdir=tmp_path,
             max_workers=1,
-            on_update=MagicMock(),
-            on_complete=MagicMock(),
+            on_update=NOOP,
+            on_complete=result.extend,
         )
-        engine._tasks = [
-            VideoTask(url="a", title="A", video_id="1", index=1, total=1)
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(download)):
+            engine.start([{"url": "http://x", "title": "X", "id": "1"}])
+        assert result[0].status == VideoStatus.CANCELLED
+
+    def test_cancel_drops_queued_downloads(self, tmp_path):
+        """Queued downloads should be cancelled without ever reaching yt-dlp."""
+        started = threading.Event()
+        release = threading.Event()
+        complete_event = threading.Event()
+        downloaded = []
+        result = []
+
+        def download(opts, urls):
+            downloaded.extend(urls)
+            started.set()
+            release.wait(timeout=5)
+
+        def on_complete(tasks):
+            result.extend(tasks)
+            complete_event.set()
+
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=1,
+            on_update=NOOP,
+            on_complete=on_complete,
+        )
+        entries = [
+            {"url": f"http://{i}", "title": str(i), "id": str(i)}
+            for i in range(3)
         ]
-        tasks = engine.tasks
-        assert len(tasks) == 1
-        assert tasks is not engine._tasks  # must be a copy
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(download)):
+            engine.start(entries)
+            assert started.wait(timeout=5)
+            engine.cancel()
+            release.set()
+            assert complete_event.wait(timeout=5)
+
+        assert downloaded == ["http://0"]
+        assert [t.status for t in result[1:]] == [VideoStatus.CANCELLED] * 2
 
 
 # ---------------------------------------------------------------------------
@@ -385,8 +896,8 @@ class TestThreadSafety:
         engine = DownloadEngine(
             outdir=Path("/tmp"),
             max_workers=1,
-            on_update=MagicMock(),
-            on_complete=MagicMock(),
+            on_update=NOOP,
+            on_complete=NOOP,
         )
         task = VideoTask(url="http://x", title="X", video_id="1", index=1, total=1)
         
@@ -411,3 +922,88 @@ class TestThreadSafety:
         
         _progress({"status": "downloading", "total_bytes": 100, "downloaded_bytes": 105})
         assert called_values[-1] <= 100.0, f"Progress exceeded 100%: {called_values[-1]}"
+
+    def test_progress_uses_size_estimate(self, tmp_path, inline_executor):
+        seen = []
+
+        def download(opts, urls):
+            opts["progress_hooks"][0]({
+                "status": "downloading",
+                "downloaded_bytes": 250,
+                "total_bytes": None,
+                "total_bytes_estimate": 1000,
+            })
+
+        def on_update(t):
+            if t.status == VideoStatus.DOWNLOADING:
+                seen.append((t.downloaded_bytes, t.total_bytes, t.progress_pct))
+
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=1,
+            on_update=on_update,
+            on_complete=NOOP,
+        )
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(download)):
+            engine.start([{"url": "http://x", "title": "X", "id": "1"}])
+        assert seen[-1] == (250, 1000, 25.0)
+
+    def test_progress_updates_coalesced(self, tmp_path, inline_executor):
+        """A burst of progress callbacks yields at most one update per interval."""
+        updates = []
+
+        def download(opts, urls):
+            hook = opts["progress_hooks"][0]
+            for i in range(1, 501):
+                hook({
+                    "status": "downloading",
+                    "downloaded_bytes": i,
+                    "total_bytes": 500,
+                })
+            hook({"status": "finished"})
+
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=1,
+            on_update=lambda t: updates.append((t.status, t.progress_pct)),
+            on_complete=NOOP,
+        )
+        start = time.monotonic()
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(download)):
+            engine.start([{"url": "http://x", "title": "X", "id": "1"}])
+        elapsed = time.monotonic() - start
+
+        progress = [u for u in updates if u[0] == VideoStatus.DOWNLOADING]
+        # one initial "started" update plus one per elapsed interval
+        assert len(progress) <= 2 + elapsed / DownloadEngine.UPDATE_INTERVAL
+        assert len(progress) < 50
+        assert updates[-1] == (VideoStatus.COMPLETED, 100.0)
+
+    def test_byte_counts_tracked_between_updates(self, tmp_path, inline_executor):
+        seen = []
+
+        def download(opts, urls):
+            hook = opts["progress_hooks"][0]
+            for done in (100, 900):
+                hook({
+                    "status": "downloading",
+                    "downloaded_bytes": done,
+                    "total_bytes_estimate": 1000,
+                })
+            # the second tick is throttled but its counts are still kept
+            task = engine.tasks[0]
+            seen.append((task.downloaded_bytes, task.total_bytes))
+            hook({"status": "finished", "downloaded_bytes": 950, "total_bytes": 950})
+
+        engine = DownloadEngine(
+            outdir=tmp_path,
+            max_workers=1,
+            on_update=NOOP,
+            on_complete=NOOP,
+        )
+        with patch.object(ytm.yt_dlp, "YoutubeDL", _fake_ydl(download)):
+            engine.start([{"url": "http://x", "title": "X", "id": "1"}])
+        task = engine.tasks[0]
+        assert seen == [(900, 1000)]
+        assert (task.downloaded_bytes, task.total_bytes) == (950, 950)
+        assert task.progress_pct == 100.0
@@ -14,16 +14,21 @@ Features:
 """
 
 import json
+import os
+import re
 import sys
 import shutil
+import tempfile
 import threading
 import time
 import concurrent.futures
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache, partial
 from pathlib import Path
 from queue import Queue, Empty
-from typing import Optional, Callable
+from typing import Optional, Callable, Union
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
@@ -35,14 +40,41 @@ except ImportError:
 
 # Global lock for thread-safe settings access
 _settings_lock = threading.Lock()
+# In-memory copy of the settings file, populated on first load
+_settings_cache: Optional[dict] = None
+
+# extract_playlist_info results: url -> (monotonic timestamp, entries)
+_PLAYLIST_CACHE_TTL = 300  # seconds
+_PLAYLIST_CACHE_SIZE = 64
+_playlist_cache: dict[str, tuple[float, list[dict]]] = {}
+_playlist_cache_lock = threading.Lock()
+
+# Worker pool shared by every DownloadEngine; threads are created on demand
+# and reused across runs. Each engine limits itself to its max_workers.
+_EXECUTOR_MAX_WORKERS = 32
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+_VIDEO_ID_RE = re.compile(r"[?&]v=([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])")
+
+
+def _extract_video_id(url: str) -> Optional[str]:
+    """Return the 11-character video id of a ``watch?v=`` URL, or None."""
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+@lru_cache(maxsize=1)
 def _get_ffmpeg_location() -> Optional[str]:
-    """Return the directory containing ffmpeg in a PyInstaller bundle, or None."""
+    """Return the directory containing ffmpeg in a PyInstaller bundle, or None.
+
+    The bundle never changes while the app runs, so the lookup is memoized.
+    """
     if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
         base = Path(sys._MEIPASS)
         for name in ("ffmpeg.exe", "ffmpeg"):
@@ -51,39 +83,127 @@ def _get_ffmpeg_location() -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=1)
 def _default_output_dir() -> str:
     return str(Path.home() / "Music" / "YouTube Downloads")
 
 
+def _default_max_workers() -> int:
+    """Default number of parallel downloads per engine.
+
+    Downloads are network-bound (ffmpeg runs out of process), so follow the
+    stdlib ThreadPoolExecutor default rather than the CPU count.
+    """
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+@lru_cache(maxsize=1)
 def _settings_path() -> Path:
-    """Return path to the persistent settings file."""
+    """Return path to the persistent settings file (fixed for the process)."""
     if getattr(sys, "frozen", False):
         # Frozen build: store settings next to the executable
-        return Path(sys.executable).parent / ".yt_mp3_settings.json"
-    return Path.home() / ".yt_mp3_settings.json"
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.expanduser("~")
+    return Path(os.path.join(base, ".yt_mp3_settings.json"))
+
+
+def _read_settings_file(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_settings_file(path: Path, settings: dict) -> None:
+    # Write a uniquely named sibling file then swap it in, so a crash
+    # mid-write never leaves a truncated settings file behind and two
+    # instances saving at once never share a temp file.
+    tmp = tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=path.name + ".",
+        suffix=".tmp", delete=False,
+    )
+    try:
+        with tmp:
+            tmp.write(json.dumps(settings, indent=2))
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
 
 
 def _load_settings() -> dict:
+    global _settings_cache
     with _settings_lock:
-        path = _settings_path()
-        if path.exists():
+        if _settings_cache is None:
+            _settings_cache = {}
             try:
-                return json.loads(path.read_text(encoding="utf-8"))
+                loaded = _read_settings_file(_settings_path())
             except (json.JSONDecodeError, OSError):
                 pass
-    return {}
+            else:
+                if isinstance(loaded, dict):
+                    _settings_cache = loaded
+        return dict(_settings_cache)
 
 
 def _save_settings(settings: dict) -> None:
+    global _settings_cache
     with _settings_lock:
+        _settings_cache = dict(settings)
         try:
-            _settings_path().write_text(
-                json.dumps(settings, indent=2), encoding="utf-8"
-            )
+            _write_settings_file(_settings_path(), settings)
         except OSError:
             pass
 
 
+def _reset_settings_cache() -> None:
+    """Forget cached settings so the next load re-reads the file."""
+    global _settings_cache
+    with _settings_lock:
+        _settings_cache = None
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_EXECUTOR_MAX_WORKERS,
+                thread_name_prefix="ytdl",
+            )
+        return _executor
+
+
+def _clear_playlist_cache() -> None:
+    with _playlist_cache_lock:
+        _playlist_cache.clear()
+
+
+def _scan_by_ext(
+    directory: Union[str, os.PathLike], exts: set[str]
+) -> dict[str, list[str]]:
+    """Group the names of regular files in ``directory`` by extension.
+
+    ``exts`` are lower-case extensions without the dot; file extensions
+    are lower-cased before matching, so ``Song.MP3`` counts as ``mp3``.
+    One scandir pass serves every extension; a missing directory yields
+    empty lists.
+    """
+    found: dict[str, list[str]] = {ext: [] for ext in exts}
+    try:
+        it = os.scandir(os.fspath(directory))
+    except OSError:
+        return found
+    with it:
+        for entry in it:
+            _, dot, ext = entry.name.rpartition(".")
+            ext = ext.lower()
+            if dot and ext in found and entry.is_file(follow_symlinks=False):
+                found[ext].append(entry.name)
+    return found
+
+
 # ---------------------------------------------------------------------------
 # Download data types
 # ---------------------------------------------------------------------------
@@ -109,6 +229,8 @@ class VideoTask:
     progress_pct: float = 0.0
     error_msg: str = ""
     attempts: int = 0
+    downloaded_bytes: int = 0
+    total_bytes: int = 0  # 0 while the size is unknown
 
 
 # ---------------------------------------------------------------------------
@@ -118,26 +240,62 @@ class VideoTask:
 class DownloadEngine:
     MAX_RETRIES = 3
     BACKOFF_BASE = 2  # seconds
+    UPDATE_INTERVAL = 0.05  # seconds between progress updates per task
 
     def __init__(
         self,
         outdir: Path,
-        max_workers: int,
         on_update: Callable[[VideoTask], None],
         on_complete: Callable[[list[VideoTask]], None],
+        max_workers: Optional[int] = None,
     ):
         self.outdir = outdir
-        self.max_workers = max_workers
+        self.max_workers = max_workers or _default_max_workers()
         self.on_update = on_update
         self.on_complete = on_complete
         self._cancel = threading.Event()
+        # Plain-bool mirror of _cancel for the per-chunk progress hook;
+        # reading it avoids the Event's internal lock.
+        self._cancel_flag = False
         self._tasks: list[VideoTask] = []
+        self._lock = threading.Lock()
+        self._futures: list[concurrent.futures.Future] = []
+        self._queue: deque[VideoTask] = deque()
+        self._remaining = 0
+        self._done_lock = threading.Lock()
+        # ffmpeg encodes are CPU-bound: run only a few at once so the other
+        # workers keep the network busy instead of oversubscribing cores.
+        self._convert_slots = threading.BoundedSemaphore(
+            min(4, os.cpu_count() or 1)
+        )
+        self._ydl_opts_template = self._make_ydl_opts_template()
 
     # -- public API ----------------------------------------------------------
 
     @staticmethod
     def extract_playlist_info(url: str) -> list[dict]:
-        """Fetch video list without downloading.  Works for single videos too."""
+        """Fetch video list without downloading.  Works for single videos too.
+
+        Non-empty results are cached per URL for a few minutes, so pressing
+        Download again (e.g. after a cancel) skips the network round-trip.
+        """
+        now = time.monotonic()
+        with _playlist_cache_lock:
+            hit = _playlist_cache.get(url)
+        if hit and now - hit[0] < _PLAYLIST_CACHE_TTL:
+            return [dict(e) for e in hit[1]]
+
+        entries = DownloadEngine._fetch_playlist_info(url)
+        if entries:
+            with _playlist_cache_lock:
+                _playlist_cache.pop(url, None)
+                _playlist_cache[url] = (now, entries)
+                while len(_playlist_cache) > _PLAYLIST_CACHE_SIZE:
+                    del _playlist_cache[next(iter(_playlist_cache))]
+        return [dict(e) for e in entries]
+
+    @staticmethod
+    def _fetch_playlist_info(url: str) -> list[dict]:
         opts: dict = {
             "extract_flat": "in_playlist",
             "quiet": True,
@@ -149,6 +307,21 @@ class DownloadEngine:
         if ffmpeg:
             opts["ffmpeg_location"] = ffmpeg
 
+        video_id = _extract_video_id(url)
+        if video_id and "list=" not in url:
+            # Plain watch URL: the extractor's own result already carries the
+            # id and title, so skip yt-dlp's format/playlist processing.
+            with yt_dlp.YoutubeDL({**opts, "noplaylist": True}) as ydl:
+                info = ydl.extract_info(url, download=False, process=False)
+            if info is None:
+                return []
+            if info.get("_type", "video") == "video":
+                return [{
+                    "url": info.get("webpage_url", url),
+                    "title": info.get("title", "Unknown"),
+                    "id": info.get("id", video_id),
+                }]
+
         with yt_dlp.YoutubeDL(opts) as ydl:
             info = ydl.extract_info(url, download=False)
 
@@ -179,22 +352,29 @@ class DownloadEngine:
         }]
 
     @staticmethod
-    def find_existing(entries: list[dict], outdir: Path) -> set[str]:
+    def find_existing(
+        entries: list[dict], outdir: Union[str, os.PathLike]
+    ) -> set[str]:
         """Return set of video IDs whose MP3 already exists in outdir."""
-        if not outdir.exists():
-            return set()
-        existing_names = {f.stem.lower() for f in outdir.glob("*.mp3")}
-        found = set()
-        for entry in entries:
-            title = entry.get("title", "")
-            if title.lower() in existing_names:
-                found.add(entry["id"])
-        return found
+        existing_names = {
+            name[:-4].casefold() for name in _scan_by_ext(outdir, {"mp3"})["mp3"]
+        }
+        return {
+            entry["id"] for entry in entries
+            if entry.get("title", "").casefold() in existing_names
+        }
 
     def start(self, entries: list[dict], skip_ids: Optional[set[str]] = None):
-        skip_ids = skip_ids or set()
+        """Download ``entries`` in the background.
+
+        Without explicit ``skip_ids``, entries whose MP3 is already in the
+        output folder are skipped, so they never reach yt-dlp's full
+        per-video extraction.
+        """
+        if skip_ids is None:
+            skip_ids = self.find_existing(entries, self.outdir)
         total = len(entries)
-        self._tasks = [
+        tasks = [
             VideoTask(
                 url=e["url"],
                 title=e["title"],
@@ -206,20 +386,43 @@ class DownloadEngine:
             )
             for i, e in enumerate(entries)
         ]
+        with self._lock:
+            self._tasks = tasks
+        self._cancel_flag = False
         self._cancel.clear()
-        threading.Thread(target=self._run_pool, daemon=True).start()
+        self._submit_downloads()
 
     def cancel(self):
+        self._cancel_flag = True
         self._cancel.set()
+        # Drop queued downloads right away instead of letting each one wait
+        # for a free worker just to notice the cancel flag.
+        self._drop_queued()
+        for future in list(self._futures):
+            future.cancel()
 
     @property
     def tasks(self) -> list[VideoTask]:
-        return list(self._tasks)
+        # _tasks is only ever rebound, never resized, so copying the
+        # snapshot outside the lock is safe.
+        with self._lock:
+            tasks = self._tasks
+        return tasks.copy()
 
     # -- internals -----------------------------------------------------------
 
     def _build_ydl_opts(self, progress_hook, postprocessor_hook) -> dict:
-        opts: dict = {
+        opts = self._ydl_opts_template.copy()
+        opts["progress_hooks"] = [progress_hook]
+        opts["postprocessor_hooks"] = [postprocessor_hook]
+        ffmpeg = _get_ffmpeg_location()
+        if ffmpeg:
+            opts["ffmpeg_location"] = ffmpeg
+        return opts
+
+    def _make_ydl_opts_template(self) -> dict:
+        """Options shared by every download; hooks are added per task."""
+        return {
             "outtmpl": str(self.outdir / "%(title)s.%(ext)s"),
             "format": "bestaudio/best",
             "postprocessors": [
@@ -232,6 +435,13 @@ class DownloadEngine:
                 {"key": "FFmpegThumbnailsConvertor", "format": "jpg"},
                 {"key": "EmbedThumbnail", "already_have_thumbnail": False},
             ],
+            "postprocessor_args": {
+                # Encode cover art straight to baseline JPEG at a fixed,
+                # moderate quality instead of ffmpeg's generic defaults.
+                # "_o" names the output side explicitly; a bare key would
+                # also land only on the first output.
+                "thumbnailsconvertor+ffmpeg_o": ["-c:v", "mjpeg", "-q:v", "3"],
+            },
             "writethumbnail": True,
             # reliability
             "retries": 5,
@@ -242,20 +452,13 @@ class DownloadEngine:
             "continuedl": True,
             "overwrites": False,
             "noplaylist": True,
-            # progress
-            "progress_hooks": [progress_hook],
-            "postprocessor_hooks": [postprocessor_hook],
             # output control
             "quiet": True,
             "no_warnings": True,
             "concurrent_fragment_downloads": 4,
         }
-        ffmpeg = _get_ffmpeg_location()
-        if ffmpeg:
-            opts["ffmpeg_location"] = ffmpeg
-        return opts
 
-    def _run_pool(self):
+    def _submit_downloads(self):
         # Only submit tasks that need downloading
         downloadable = [t for t in self._tasks if t.status == VideoStatus.PENDING]
         # Mark skipped tasks immediately
@@ -267,22 +470,60 @@ class DownloadEngine:
             self.on_complete(self._tasks)
             return
 
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=self.max_workers
-        ) as pool:
-            futures = {
-                pool.submit(self._download_one, task): task
-                for task in downloadable
-            }
-            for future in concurrent.futures.as_completed(futures):
-                task = futures[future]
-                try:
-                    future.result()
-                except Exception as exc:
-                    task.status = VideoStatus.FAILED
-                    task.error_msg = str(exc)
-                    self.on_update(task)
-        self.on_complete(self._tasks)
+        # Whichever task finishes last reports completion; no supervisor
+        # thread sits waiting on the pool.
+        with self._done_lock:
+            self._remaining = len(downloadable)
+        # The pool is shared, so parallelism is bounded here instead: start
+        # max_workers downloads and let each finished one pull the next.
+        self._futures = []
+        self._queue = deque(downloadable)
+        for _ in range(min(self.max_workers, len(downloadable))):
+            self._submit_next()
+        if self._cancel.is_set():
+            self.cancel()
+
+    def _submit_next(self):
+        if self._cancel_flag:
+            self._drop_queued()
+            return
+        try:
+            task = self._queue.popleft()
+        except IndexError:
+            return
+        future = _get_executor().submit(self._download_one, task)
+        future.add_done_callback(partial(self._on_task_done, task))
+        self._futures.append(future)
+
+    def _drop_queued(self):
+        while True:
+            try:
+                task = self._queue.popleft()
+            except IndexError:
+                return
+            task.status = VideoStatus.CANCELLED
+            self.on_update(task)
+            self._task_finished()
+
+    def _on_task_done(self, task: VideoTask, future: concurrent.futures.Future):
+        # Runs on the worker thread, or on the caller of cancel() for
+        # downloads that never started.
+        if future.cancelled():
+            task.status = VideoStatus.CANCELLED
+            self.on_update(task)
+        elif future.exception() is not None:
+            task.status = VideoStatus.FAILED
+            task.error_msg = str(future.exception())
+            self.on_update(task)
+        self._submit_next()
+        self._task_finished()
+
+    def _task_finished(self):
+        with self._done_lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+        if last:
+            self.on_complete(self._tasks)
 
     def _download_one(self, task: VideoTask):
         for attempt in range(1, self.MAX_RETRIES + 1):
@@ -294,34 +535,67 @@ class DownloadEngine:
             task.attempts = attempt
             task.status = VideoStatus.DOWNLOADING
             task.progress_pct = 0.0
+            task.downloaded_bytes = 0
+            task.total_bytes = 0
             task.error_msg = ""
             self.on_update(task)
 
+            last_update = 0.0
+            converting = False
+
             try:
                 def _progress(d, _t=task):
-                    if self._cancel.is_set():
+                    nonlocal last_update
+                    if self._cancel_flag:
                         raise yt_dlp.utils.DownloadCancelled()
                     if d["status"] == "downloading":
-                        total_bytes = d.get("total_bytes") or d.get(
-                            "total_bytes_estimate"
+                        _t.downloaded_bytes = d.get("downloaded_bytes") or 0
+                        _t.total_bytes = (
+                            d.get("total_bytes")
+                            or d.get("total_bytes_estimate")
+                            or 0
                         )
-                        if total_bytes and total_bytes > 0:
+                        # yt-dlp reports every chunk; forward at most one
+                        # update per interval so the GUI queue stays small.
+                        now = time.monotonic()
+                        if now - last_update < self.UPDATE_INTERVAL:
+                            return
+                        last_update = now
+                        if _t.total_bytes > 0:
                             _t.progress_pct = min(
                                 100.0,
-                                d["downloaded_bytes"] / total_bytes * 100
+                                _t.downloaded_bytes / _t.total_bytes * 100
                             )
                         self.on_update(_t)
                     elif d["status"] == "finished":
+                        # The file is complete, so its size is the total
+                        # even if only an estimate was known before.
+                        _t.downloaded_bytes = _t.total_bytes = (
+                            d.get("total_bytes")
+                            or d.get("downloaded_bytes")
+                            or _t.downloaded_bytes
+                        )
                         _t.progress_pct = 100.0
                         _t.status = VideoStatus.POSTPROCESSING
                         self.on_update(_t)
 
-                def _postproc(_d, _t=task):
-                    pass  # completion handled after ydl.download returns
+                def _postproc(d, _t=task):
+                    # Completion is handled after ydl.download returns; this
+                    # only waits for a conversion slot before ffmpeg starts.
+                    nonlocal converting
+                    if d["status"] == "started" and not converting:
+                        while not self._convert_slots.acquire(timeout=0.1):
+                            if self._cancel_flag:
+                                raise yt_dlp.utils.DownloadCancelled()
+                        converting = True
 
                 opts = self._build_ydl_opts(_progress, _postproc)
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    ydl.download([task.url])
+                try:
+                    with yt_dlp.YoutubeDL(opts) as ydl:
+                        ydl.download([task.url])
+                finally:
+                    if converting:
+                        self._convert_slots.release()
 
                 task.status = VideoStatus.COMPLETED
                 task.progress_pct = 100.0
@@ -743,10 +1017,13 @@ class App:
         
         # Remove all MP3 files not in completed list
         removed_count = 0
-        for mp3_file in outdir.glob("*.mp3"):
+        for name in _scan_by_ext(outdir, {"mp3"})["mp3"]:
+            # Only touch files yt-dlp itself names "*.mp3".
+            if not name.endswith(".mp3"):
+                continue
             try:
-                if mp3_file.name not in completed_files:
-                    mp3_file.unlink()
+                if name not in completed_files:
+                    (outdir / name).unlink()
                     removed_count += 1
             except OSError:
                 pass
@@ -865,10 +1142,15 @@ class App:
 # Utilities
 # ---------------------------------------------------------------------------
 
+_ELLIPSIS = "\u2026"
+
+
 def _truncate(text: str, maxlen: int) -> str:
     if len(text) <= maxlen:
         return text
-    return text[: maxlen - 1] + "\u2026"
+    if maxlen <= 0:
+        return ""
+    return text[: maxlen - 1] + _ELLIPSIS
 
 
 # ---------------------------------------------------------------------------